@@ -0,0 +1,2764 @@
+# Task model, storage and command engine for the Neon To-Do app.
+# Has no UI dependencies: run it directly to execute commands headless, e.g.
+#   python todo_core.py --exec "capture buy milk"
+#   python todo_core.py --script commands.txt
+
+import argparse
+import csv
+import gzip
+import heapq
+import json
+import os
+import queue
+import re
+import shlex
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+
+DATA_FILE = Path("tasks.json")
+JOURNAL_FILE = Path("tasks.journal")
+JOURNAL_COMPACT_MIN = 500
+DB_FILE = Path("tasks.db")
+UNDO_LIMIT = 200
+QUERY_CACHE_SIZE = 64
+REFRESH_PANELS = ("list", "calendar", "stats", "timeline")
+QUERY_TERM = re.compile(
+    r"^(tag|category|cat|priority|pri|status|repeat|due)(<=|>=|<|>|:|=)(.+)$", re.IGNORECASE
+)
+STATS_FILE = Path("stats.json")
+AUTOSYNC_DIR = Path("autosync")
+# The SQLite store copies itself into AUTOSYNC_DIR at most this often (seconds); exit forces a copy.
+AUTOSYNC_INTERVAL = 5
+CSV_DEFAULT = Path("tasks.csv")
+# CSV imports are validated and written to the store this many rows at a time.
+IMPORT_CHUNK = 5000
+IMPORT_ERROR_LOG = 20
+IMPORT_PARSE_CACHE = 4096
+# Exports run on a worker thread and hand the file this many records at a time.
+EXPORT_CHUNK = 2000
+EXPORT_BUFFER = 1 << 16
+EXPORT_POLL_MS = 100
+# Saves are handed to a background thread; writes queued within this window share one pass.
+PERSIST_COALESCE_MS = 25
+PERSIST_POLL_MS = 200
+PERSIST_CLOSE_TIMEOUT = 10
+# Removed tasks leave a gap in the task table until this many have piled up.
+TABLE_COMPACT_MIN = 64
+PRIORITY_ORDER = {"high": 0, "med": 1, "low": 2, None: 3}
+# Commands that manage their own transactions or history and so cannot join a batch.
+BATCH_EXCLUDED = ("import", "storage", "undo", "redo", "source")
+BATCH_ERROR_LOG = 20
+# Task selectors: a row number, a range of rows (3-40) or a task id (#12); lists join them with commas.
+TASK_REF = re.compile(r"^(?:#(\d+)|(\d+)(?:-(\d+))?)$")
+COMMAND_ALIASES = {
+    "a": "add",
+    "rm": "remove",
+    "c": "complete",
+    "ls": "list",
+    "u": "update",
+    "du": "due",
+    "fl": "filter",
+    "cl": "clear",
+    "ref": "refresh",
+    "th": "theme",
+    "ar": "archive",
+    "fo": "focus",
+    "cap": "capture",
+    "rs": "reschedule",
+    "ics": "exportics",
+    "pomo": "pomodoro",
+    "-h": "help",
+    "--help": "help",
+}
+
+
+class PersistenceWorker:
+    """Background thread that applies queued store writes and file saves in order."""
+
+    def __init__(self, coalesce_ms=PERSIST_COALESCE_MS):
+        self.jobs = queue.Queue()
+        self.errors = queue.Queue()
+        # Stores whose open transaction lost a write; read by the UI thread only after flush().
+        self.failed = set()
+        self.coalesce = coalesce_ms / 1000
+        self.thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self.thread.start()
+
+    @property
+    def pending(self):
+        return self.jobs.unfinished_tasks
+
+    def submit(self, kind, *payload):
+        self.jobs.put((kind,) + payload)
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self.submit("barrier", done)
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            jobs = [self.jobs.get()]
+            time.sleep(self.coalesce)
+            while True:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(jobs)
+            finally:
+                for _ in jobs:
+                    self.jobs.task_done()
+
+    def _apply(self, jobs):
+        # Adjacent appends to one store become a single write; only the newest text per file is kept.
+        batch = None
+        files = {}
+        for job in jobs:
+            kind = job[0]
+            if kind == "write":
+                files[job[1]] = job[2:]
+                continue
+            if kind == "append":
+                _, store, ops, commit = job
+                if batch is not None and batch[0] is store and (commit or not batch[2]):
+                    batch[1].extend(ops)
+                    batch[2] = commit
+                    continue
+                self._append(batch)
+                batch = [store, list(ops), commit]
+                continue
+            self._append(batch)
+            batch = None
+            if kind == "barrier":
+                self._write_files(files)
+                files = {}
+                job[1].set()
+            elif kind == "commit" and job[1] in self.failed:
+                self._refuse(job[1])
+            else:
+                if kind in ("rollback", "compact"):
+                    self.failed.discard(job[1])
+                self._call(f"Store {kind} failed", getattr(job[1], kind), *job[2:])
+        self._append(batch)
+        self._write_files(files)
+
+    def _append(self, batch):
+        if batch is None:
+            return
+        store, ops, commit = batch
+        if store in self.failed:
+            # Nothing more may land in a transaction that already lost a write.
+            if commit:
+                self._refuse(store)
+            return
+        if not self._call("Save failed", store.append, ops, commit=commit) and not commit:
+            self.failed.add(store)
+
+    def _refuse(self, store):
+        self.failed.discard(store)
+        self.errors.put("Save refused: part of the transaction failed, so all of it was rolled back.")
+        self._call("Store rollback failed", store.rollback)
+
+    def _write_files(self, files):
+        for path, (text, mirror_dir) in files.items():
+            self._call(f"Writing {path.name} failed", self._write_file, path, text, mirror_dir)
+
+    @staticmethod
+    def _write_file(path, text, mirror_dir):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+        if mirror_dir is not None:
+            try:
+                mirror_dir.mkdir(exist_ok=True)
+                shutil.copyfile(path, mirror_dir / path.name)
+            except OSError:
+                pass
+
+    def _call(self, label, func, *args, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except (OSError, sqlite3.Error) as exc:
+            self.errors.put(f"{label}: {exc}")
+            return False
+        return True
+
+
+class TaskExporter:
+    """Streams serialized task records to a file as CSV, ICS or JSON Lines, chunk by chunk."""
+
+    FORMATS = {"csv": ".csv", "ics": ".ics", "jsonl": ".jsonl"}
+    CSV_FIELDS = (
+        "name",
+        "due",
+        "time",
+        "status",
+        "priority",
+        "recurrence",
+        "tag",
+        "category",
+        "archived",
+        "remind",
+        "completed_at",
+    )
+
+    class Echo:
+        """File-like sink whose write() hands the formatted CSV row back to the caller."""
+
+        def write(self, value):
+            return value
+
+    def __init__(self, fmt, chunk_rows=EXPORT_CHUNK):
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.count = 0
+
+    @classmethod
+    def detect(cls, path):
+        suffixes = [suffix.lower() for suffix in path.suffixes]
+        compress = bool(suffixes) and suffixes[-1] == ".gz"
+        if compress:
+            suffixes.pop()
+        for fmt, suffix in cls.FORMATS.items():
+            if suffixes and suffixes[-1] == suffix:
+                return fmt, compress
+        return None, compress
+
+    def chunks(self, records):
+        pieces = []
+        for piece in getattr(self, f"_{self.fmt}_lines")(records):
+            pieces.append(piece)
+            if len(pieces) >= self.chunk_rows:
+                yield "".join(pieces)
+                pieces = []
+        if pieces:
+            yield "".join(pieces)
+
+    def write(self, path, records, compress=False):
+        # Written beside the target and swapped in, so a failed export never leaves half a file.
+        tmp = path.with_name(path.name + ".tmp")
+        self.count = 0
+        try:
+            if compress:
+                handle = gzip.open(tmp, "wt", encoding="utf-8", newline="")
+            else:
+                handle = open(tmp, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER)
+            with handle:
+                for chunk in self.chunks(records):
+                    handle.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return self.count
+
+    def _csv_lines(self, records):
+        writer = csv.writer(self.Echo())
+        yield writer.writerow(self.CSV_FIELDS)
+        for record in records:
+            self.count += 1
+            yield writer.writerow(
+                (
+                    record["name"],
+                    record.get("due") or "",
+                    record.get("time") or "",
+                    record["status"],
+                    record.get("priority") or "med",
+                    record.get("recurrence") or "",
+                    record.get("tag") or "",
+                    record.get("category") or "",
+                    "1" if record.get("archived") else "0",
+                    record.get("remind") or "",
+                    record.get("completed_at") or "",
+                )
+            )
+
+    def _jsonl_lines(self, records):
+        for record in records:
+            self.count += 1
+            yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _ics_lines(self, records):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//NeonToDo//EN\r\n"
+        for record in records:
+            if record.get("archived") or not record.get("due"):
+                continue
+            self.count += 1
+            day = record["due"].replace("-", "")
+            hour, _, minute = (record.get("time") or "").partition(":")
+            if hour.isdigit() and minute.isdigit():
+                start = f"DTSTART:{day}T{int(hour):02d}{int(minute):02d}00"
+            else:
+                start = f"DTSTART;VALUE=DATE:{day}"
+            yield "".join(
+                (
+                    "BEGIN:VEVENT\r\n",
+                    f"UID:{record['id']}@neon-todo\r\n",
+                    f"DTSTAMP:{stamp}\r\n",
+                    f"{start}\r\n",
+                    self._ics_fold(f"SUMMARY:{self._ics_text(record['name'])}"),
+                    "END:VEVENT\r\n",
+                )
+            )
+        yield "END:VCALENDAR\r\n"
+
+    @staticmethod
+    def _ics_text(value):
+        value = value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        return value.replace("\r\n", "\\n").replace("\n", "\\n")
+
+    @staticmethod
+    def _ics_fold(line):
+        # RFC 5545: content lines are at most 75 octets; continuations start with one space.
+        if len(line.encode("utf-8")) <= 75:
+            return line + "\r\n"
+        parts = []
+        current = []
+        size = 0
+        limit = 75
+        for char in line:
+            width = len(char.encode("utf-8"))
+            if size + width > limit:
+                parts.append("".join(current))
+                current = []
+                size = 0
+                limit = 74
+            current.append(char)
+            size += width
+        parts.append("".join(current))
+        return "\r\n ".join(parts) + "\r\n"
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Task:
+    """One task as a slotted record: short strings are interned and due is a date ordinal.
+
+    Item access (``task["due"]``, ``task.get("tag")``) reads the same fields
+    the old dict records had, so views and indexes work on either.
+    """
+
+    FIELDS = (
+        "id", "name", "due", "status", "priority", "recurrence",
+        "time", "tag", "category", "archived", "completed_at", "remind",
+    )
+    INTERNED = frozenset(("status", "priority", "recurrence", "time", "tag", "category", "completed_at"))
+    __slots__ = (
+        "id", "name", "due_ord", "status", "priority", "recurrence",
+        "time", "tag", "category", "archived", "completed_at", "remind",
+    )
+
+    def __init__(
+        self, id, name, due=None, status="pending", priority="med", recurrence=None,
+        time=None, tag=None, category=None, archived=False, completed_at=None, remind=None,
+    ):
+        self.id = id
+        self.name = name
+        self.due_ord = due.toordinal() if due else 0
+        self.status = _intern(status)
+        self.priority = _intern(priority)
+        self.recurrence = _intern(recurrence)
+        self.time = _intern(time)
+        self.tag = _intern(tag)
+        self.category = _intern(category)
+        self.archived = bool(archived)
+        self.completed_at = _intern(completed_at)
+        self.remind = remind
+
+    @property
+    def due(self):
+        return date.fromordinal(self.due_ord) if self.due_ord else None
+
+    @due.setter
+    def due(self, value):
+        self.due_ord = value.toordinal() if value else 0
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key in self.INTERNED:
+            value = _intern(value)
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def assign(self, other):
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(other, slot))
+
+    def copy(self):
+        clone = Task.__new__(Task)
+        clone.assign(self)
+        return clone
+
+    def to_record(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "due": self.due.isoformat() if self.due_ord else None,
+            "status": self.status,
+            "priority": self.priority,
+            "recurrence": self.recurrence,
+            "time": self.time,
+            "tag": self.tag,
+            "category": self.category,
+            "archived": self.archived,
+            "completed_at": self.completed_at,
+            "remind": self.remind,
+        }
+
+    @classmethod
+    def from_record(cls, raw):
+        due = None
+        if raw.get("due"):
+            try:
+                due = date.fromisoformat(raw["due"])
+            except ValueError:
+                due = None
+        return cls(
+            int(raw.get("id", 0)),
+            str(raw.get("name", "")).strip() or "Untitled task",
+            due,
+            raw.get("status", "pending"),
+            raw.get("priority", "med"),
+            raw.get("recurrence"),
+            raw.get("time"),
+            raw.get("tag"),
+            raw.get("category"),
+            raw.get("archived"),
+            raw.get("completed_at"),
+            int(raw["remind"]) if raw.get("remind") else None,
+        )
+
+
+class TaskTable:
+    """Primary store of tasks keyed by id; removal tombstones a row until the next compaction."""
+
+    def __init__(self, tasks=()):
+        self.rows = []
+        self.slots = {}
+        self.dead = 0
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __iter__(self):
+        return (row for row in self.rows if row is not None)
+
+    def __contains__(self, task_id):
+        return task_id in self.slots
+
+    def get(self, task_id):
+        slot = self.slots.get(task_id)
+        return None if slot is None else self.rows[slot]
+
+    def add(self, task):
+        slot = self.slots.get(task.id)
+        if slot is not None:
+            self.rows[slot] = task
+            return
+        self.slots[task.id] = len(self.rows)
+        self.rows.append(task)
+
+    def remove(self, task_id):
+        slot = self.slots.pop(task_id, None)
+        if slot is None:
+            return None
+        task = self.rows[slot]
+        self.rows[slot] = None
+        self.dead += 1
+        if self.dead >= TABLE_COMPACT_MIN and self.dead * 2 >= len(self.rows):
+            self.compact()
+        return task
+
+    def compact(self):
+        # Iterators already handed out keep walking the old row list.
+        self.rows = [row for row in self.rows if row is not None]
+        self.slots = {row.id: slot for slot, row in enumerate(self.rows)}
+        self.dead = 0
+
+
+class TaskJournal:
+    """Append-only log of task edits replayed on top of the tasks.json snapshot.
+
+    Uncommitted appends are bracketed by begin/commit records, and load()
+    drops a transaction whose commit record never made it to disk.
+    """
+
+    def __init__(self, snapshot_path, journal_path, mirror_dir=None, compact_min=JOURNAL_COMPACT_MIN):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.mirror_dir = mirror_dir
+        self.compact_min = compact_min
+        self.entries = 0
+        self._txn = None
+
+    def load(self):
+        records = {}
+        if self.snapshot_path.exists():
+            try:
+                raw = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                raw = []
+            for item in raw if isinstance(raw, list) else []:
+                if isinstance(item, dict):
+                    records[item.get("id")] = item
+        self.entries = 0
+        if self.journal_path.exists():
+            try:
+                lines = self.journal_path.read_bytes().splitlines(keepends=True)
+            except OSError:
+                lines = []
+            offset = 0
+            txn = txn_start = None
+            for line in lines:
+                start, offset = offset, offset + len(line)
+                try:
+                    op = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # A torn trailing write from a crash; everything before it is intact.
+                    continue
+                kind = op.get("op")
+                if kind == "begin":
+                    txn, txn_start = [], start
+                elif kind == "commit":
+                    for item in txn or []:
+                        self._replay(records, item)
+                    self.entries += len(txn or [])
+                    txn = None
+                elif txn is not None:
+                    txn.append(op)
+                else:
+                    self._replay(records, op)
+                    self.entries += 1
+            if txn is not None:
+                # An import cut short by a crash; cut it off so later appends replay normally.
+                self._discard_tail(txn_start)
+        return list(records.values())
+
+    def _discard_tail(self, size):
+        try:
+            self._truncate(self.journal_path, size)
+            if self.mirror_dir is not None:
+                shutil.copyfile(self.journal_path, self.mirror_dir / self.journal_path.name)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _replay(records, op):
+        kind = op.get("op")
+        if kind in ("add", "update"):
+            task = op.get("task") or {}
+            records[task.get("id")] = task
+        elif kind == "complete":
+            task = records.get(op.get("id"))
+            if task is not None:
+                task["status"] = "completed"
+                task["completed_at"] = op.get("completed_at")
+        elif kind == "remove":
+            records.pop(op.get("id"), None)
+        elif kind == "clear":
+            records.clear()
+
+    def append(self, ops, commit=True):
+        records = list(ops)
+        if ops and not commit and self._txn is None:
+            mirror = self.mirror_dir / self.journal_path.name if self.mirror_dir is not None else None
+            self._txn = (self._size(self.journal_path), self._size(mirror), self.entries)
+            records.insert(0, {"op": "begin"})
+        if commit and self._txn is not None:
+            records.append({"op": "commit"})
+        self._write(records)
+        self.entries += len(ops)
+        if commit:
+            self._txn = None
+
+    def commit(self):
+        if self._txn is not None:
+            self._write([{"op": "commit"}])
+            self._txn = None
+
+    def _write(self, records):
+        if not records:
+            return
+        data = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in records)
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(data)
+        if self.mirror_dir is not None:
+            try:
+                self.mirror_dir.mkdir(exist_ok=True)
+                with (self.mirror_dir / self.journal_path.name).open("a", encoding="utf-8") as handle:
+                    handle.write(data)
+            except OSError:
+                pass
+
+    def rollback(self):
+        # Uncommitted appends are cut off the end of the journal (and its mirror).
+        if self._txn is None:
+            return
+        size, mirror_size, self.entries = self._txn
+        self._txn = None
+        self._truncate(self.journal_path, size)
+        if self.mirror_dir is not None:
+            try:
+                self._truncate(self.mirror_dir / self.journal_path.name, mirror_size)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _size(path):
+        return path.stat().st_size if path is not None and path.exists() else 0
+
+    @staticmethod
+    def _truncate(path, size):
+        if not path.exists():
+            return
+        with path.open("r+b") as handle:
+            handle.truncate(size)
+
+    def needs_compaction(self, entries, task_count):
+        return entries >= max(self.compact_min, task_count)
+
+    # The journal keeps no on-disk indexes; callers fall back to scanning.
+    def query_ids(self, view_mode, view_value=None, today=None, hide_completed=False):
+        return None
+
+    def next_pending_id(self):
+        return None
+
+    # Appends and compactions already copy themselves into mirror_dir.
+    def mirror(self, force=False):
+        pass
+
+    def compact(self, records):
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        tmp.write_text(json.dumps(records, indent=2), encoding="utf-8")
+        os.replace(tmp, self.snapshot_path)
+        self.journal_path.unlink(missing_ok=True)
+        self.entries = 0
+        if self.mirror_dir is not None:
+            try:
+                self.mirror_dir.mkdir(exist_ok=True)
+                shutil.copyfile(self.snapshot_path, self.mirror_dir / self.snapshot_path.name)
+                (self.mirror_dir / self.journal_path.name).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+class SqliteTaskStore:
+    """Task rows in a WAL-mode SQLite file, indexed for the calendar and list views."""
+
+    COLUMNS = (
+        "id",
+        "name",
+        "due",
+        "status",
+        "priority",
+        "recurrence",
+        "time",
+        "tag",
+        "category",
+        "archived",
+        "completed_at",
+        "remind",
+    )
+    INDEXED = ("due", "status", "archived", "tag", "category", "priority")
+
+    def __init__(self, path, mirror_dir=None):
+        self.path = path
+        self.mirror_dir = mirror_dir
+        self.is_new = not path.exists()
+        self._mirrored_at = None
+        self._mirror_stale = False
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        # Connections are bound to their thread; writes from the persistence worker use their own.
+        self._local = threading.local()
+        self._local.conn = self.conn
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, name TEXT NOT NULL, due TEXT, status TEXT NOT NULL, "
+            "priority TEXT, recurrence TEXT, time TEXT, tag TEXT, category TEXT, "
+            "archived INTEGER NOT NULL DEFAULT 0, completed_at TEXT, remind INTEGER)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "remind" not in columns:
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN remind INTEGER")
+        for column in self.INDEXED:
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks({column})")
+        self.conn.commit()
+        self._upsert = (
+            f"INSERT OR REPLACE INTO tasks ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join(':' + c for c in self.COLUMNS)})"
+        )
+
+    def load(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM tasks ORDER BY rowid")]
+
+    def _writer(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path))
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def append(self, ops, commit=True):
+        # With commit=False the rows stay in the open transaction until commit()/rollback().
+        conn = self._writer()
+        try:
+            for op in ops:
+                kind = op.get("op")
+                if kind in ("add", "update"):
+                    conn.execute(self._upsert, op["task"])
+                elif kind == "complete":
+                    conn.execute(
+                        "UPDATE tasks SET status = 'completed', completed_at = ? WHERE id = ?",
+                        (op.get("completed_at"), op["id"]),
+                    )
+                elif kind == "remove":
+                    conn.execute("DELETE FROM tasks WHERE id = ?", (op["id"],))
+                elif kind == "clear":
+                    conn.execute("DELETE FROM tasks")
+            if commit:
+                conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        if commit:
+            self.mirror()
+
+    def commit(self):
+        self._writer().commit()
+        self.mirror()
+
+    def rollback(self):
+        self._writer().rollback()
+
+    def needs_compaction(self, entries, task_count):
+        return False
+
+    def compact(self, records):
+        conn = self._writer()
+        with conn:
+            conn.execute("DELETE FROM tasks")
+            conn.executemany(self._upsert, records)
+        self._mirror_stale = True
+        self.mirror(force=True)
+
+    def mirror(self, force=False):
+        # A full backup per save would dominate small edits, so copies are spaced AUTOSYNC_INTERVAL apart.
+        if self.mirror_dir is None:
+            return
+        if force and not self._mirror_stale:
+            return
+        now = time.monotonic()
+        if not force and self._mirrored_at is not None and now - self._mirrored_at < AUTOSYNC_INTERVAL:
+            self._mirror_stale = True
+            return
+        try:
+            self.mirror_dir.mkdir(exist_ok=True)
+            target = sqlite3.connect(str(self.mirror_dir / self.path.name))
+            with target:
+                self._writer().backup(target)
+            target.close()
+        except (OSError, sqlite3.Error):
+            return
+        self._mirrored_at = now
+        self._mirror_stale = False
+
+    def query_ids(self, view_mode, view_value=None, today=None, hide_completed=False):
+        today = today or date.today()
+        if view_mode == "archive":
+            where, params = "archived = 1", []
+        elif view_mode == "due" and view_value:
+            where, params = "due = ? AND archived = 0", [view_value.isoformat()]
+        elif view_mode == "today":
+            where, params = "due = ? AND archived = 0", [today.isoformat()]
+        elif view_mode == "week":
+            where = "due BETWEEN ? AND ? AND archived = 0"
+            params = [today.isoformat(), (today + timedelta(days=6)).isoformat()]
+        elif view_mode == "overdue":
+            where = "due < ? AND status != 'completed' AND archived = 0"
+            params = [today.isoformat()]
+        else:
+            return None
+        if hide_completed and view_mode != "archive":
+            where += " AND status != 'completed'"
+        rows = self.conn.execute(f"SELECT id FROM tasks WHERE {where} ORDER BY rowid", params)
+        return [row[0] for row in rows]
+
+    def next_pending_id(self):
+        row = self.conn.execute(
+            "SELECT id FROM tasks WHERE due IS NOT NULL AND status != 'completed' AND archived = 0 "
+            "ORDER BY due, rowid LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+
+class TaskIndex:
+    """In-memory secondary indexes over task ids, kept in step with every edit.
+
+    Date, status, tag and category buckets only hold active tasks; archived
+    ids live in their own set since only the archive view asks for them.
+    """
+
+    FIELDS = ("due", "status", "tag", "category")
+
+    def __init__(self):
+        self.buckets = {field: {} for field in self.FIELDS}
+        self.archived = set()
+        self.dirty_dates = set()
+        self._dates_reset = True
+        self._keys = {}
+
+    def rebuild(self, tasks):
+        self.buckets = {field: {} for field in self.FIELDS}
+        self.archived = set()
+        self.dirty_dates = set()
+        self._dates_reset = True
+        self._keys = {}
+        for task in tasks:
+            self.update(task)
+
+    def update(self, task):
+        task_id = task["id"]
+        key = (bool(task.get("archived")),) + tuple(task.get(field) for field in self.FIELDS)
+        old = self._keys.get(task_id)
+        if old == key:
+            return
+        if old is not None:
+            self._unlink(task_id, old)
+        self._keys[task_id] = key
+        if key[0]:
+            self.archived.add(task_id)
+            return
+        if key[1] is not None:
+            self.dirty_dates.add(key[1])
+        for field, value in zip(self.FIELDS, key[1:]):
+            if value is not None:
+                self.buckets[field].setdefault(value, set()).add(task_id)
+
+    def discard(self, task_id):
+        old = self._keys.pop(task_id, None)
+        if old is not None:
+            self._unlink(task_id, old)
+
+    def _unlink(self, task_id, key):
+        if key[0]:
+            self.archived.discard(task_id)
+            return
+        if key[1] is not None:
+            self.dirty_dates.add(key[1])
+        for field, value in zip(self.FIELDS, key[1:]):
+            bucket = self.buckets[field].get(value)
+            if bucket is None:
+                continue
+            bucket.discard(task_id)
+            if not bucket:
+                del self.buckets[field][value]
+
+    def ids(self, field, value):
+        return self.buckets[field].get(value, set())
+
+    def ids_folded(self, field, value):
+        ids = set()
+        for key, bucket in self.buckets[field].items():
+            if key.lower() == value:
+                ids |= bucket
+        return ids
+
+    def due_between(self, start, end):
+        ids = set()
+        for day, bucket in self.buckets["due"].items():
+            if start <= day <= end:
+                ids |= bucket
+        return ids
+
+    def view_ids(self, view_mode, view_value=None, today=None, hide_completed=False):
+        today = today or date.today()
+        completed = self.ids("status", "completed")
+        if view_mode == "archive":
+            return set(self.archived)
+        if view_mode == "due" and view_value:
+            ids = set(self.ids("due", view_value))
+        elif view_mode == "today":
+            ids = set(self.ids("due", today))
+        elif view_mode == "week":
+            ids = self.due_between(today, today + timedelta(days=6))
+        elif view_mode == "overdue":
+            ids = self.due_between(date.min, today - timedelta(days=1)) - completed
+        else:
+            return None
+        if hide_completed:
+            ids -= completed
+        return ids
+
+    def pop_dirty_dates(self):
+        # None means the index was rebuilt and every date has to be resynced.
+        dates = None if self._dates_reset else self.dirty_dates
+        self._dates_reset = False
+        self.dirty_dates = set()
+        return dates
+
+    def next_pending_id(self):
+        completed = self.ids("status", "completed")
+        for day in sorted(self.buckets["due"]):
+            pending = self.buckets["due"][day] - completed
+            if pending:
+                return min(pending)
+        return None
+
+
+class SearchIndex:
+    """Trigram postings over the searchable text of each task, verified by substring."""
+
+    def __init__(self):
+        self.postings = {}
+        self._fields = {}
+
+    @staticmethod
+    def _trigrams(fields):
+        grams = set()
+        for text in fields:
+            grams.update(text[i : i + 3] for i in range(len(text) - 2))
+        return grams
+
+    def rebuild(self, entries):
+        self.postings = {}
+        self._fields = {}
+        for task_id, fields in entries:
+            self.update(task_id, fields)
+
+    def update(self, task_id, fields):
+        if self._fields.get(task_id) == fields:
+            return
+        self.discard(task_id)
+        self._fields[task_id] = fields
+        for gram in self._trigrams(fields):
+            self.postings.setdefault(gram, set()).add(task_id)
+
+    def discard(self, task_id):
+        fields = self._fields.pop(task_id, None)
+        if fields is None:
+            return
+        for gram in self._trigrams(fields):
+            bucket = self.postings.get(gram)
+            if bucket is None:
+                continue
+            bucket.discard(task_id)
+            if not bucket:
+                del self.postings[gram]
+
+    def search(self, query, candidates=None):
+        query = query.lower()
+        grams = self._trigrams((query,))
+        if grams:
+            buckets = sorted((self.postings.get(g, set()) for g in grams), key=len)
+            ids = set(buckets[0])
+            for bucket in buckets[1:]:
+                ids &= bucket
+                if not ids:
+                    break
+            if candidates is not None:
+                ids &= candidates
+        else:
+            ids = candidates if candidates is not None else self._fields.keys()
+        return {i for i in ids if any(query in text for text in self._fields.get(i, ()))}
+
+
+class TaskQuery:
+    """A compiled filter: (index lookup, per-task check) terms plus free text."""
+
+    def __init__(self, text=""):
+        self.terms = []
+        self.text = text
+
+    def add(self, check, lookup=None):
+        self.terms.append((lookup, check))
+
+
+class TaskCounters:
+    """Running totals behind the stats bar, adjusted by each task edit."""
+
+    def __init__(self):
+        self.day = date.today()
+        self._keys = {}
+        self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.completed = 0
+        self.overdue = 0
+        self.due_today = 0
+        self.completed_today = 0
+
+    def rebuild(self, tasks):
+        self._keys = {}
+        self._reset()
+        for task in tasks:
+            self.update(task)
+
+    @staticmethod
+    def _key(task):
+        if task.get("archived"):
+            return None
+        return (task["status"] == "completed", task["due"], task.get("completed_at"))
+
+    def _apply(self, key, sign):
+        if key is None:
+            return
+        done, due, completed_at = key
+        self.total += sign
+        if done:
+            self.completed += sign
+            if completed_at and str(completed_at) == self.day.isoformat():
+                self.completed_today += sign
+        elif due is not None:
+            if due < self.day:
+                self.overdue += sign
+            elif due == self.day:
+                self.due_today += sign
+
+    def update(self, task):
+        key = self._key(task)
+        old = self._keys.get(task["id"])
+        if task["id"] in self._keys and old == key:
+            return
+        self._apply(old, -1)
+        self._apply(key, 1)
+        self._keys[task["id"]] = key
+
+    def discard(self, task_id):
+        self._apply(self._keys.pop(task_id, None), -1)
+
+    def roll(self, today):
+        # Overdue/today buckets depend on the date, so they are recounted once per rollover.
+        if today == self.day:
+            return
+        self.day = today
+        self._reset()
+        for key in self._keys.values():
+            self._apply(key, 1)
+
+
+class ReminderQueue:
+    """Min-heap of (fire time, task id); entries superseded by an edit are skipped lazily."""
+
+    def __init__(self):
+        self._heap = []
+        self._times = {}
+
+    def rebuild(self, items):
+        self._times = {task_id: when for task_id, when in items if when is not None}
+        self._heap = [(when, task_id) for task_id, when in self._times.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, task_id, when):
+        if self._times.get(task_id) == when:
+            return False
+        if when is None:
+            self._times.pop(task_id, None)
+            return False
+        self._times[task_id] = when
+        heapq.heappush(self._heap, (when, task_id))
+        if len(self._heap) > 2 * len(self._times) + 64:
+            self.rebuild(list(self._times.items()))
+        return True
+
+    def discard(self, task_id):
+        self._times.pop(task_id, None)
+
+    def peek(self):
+        heap = self._heap
+        while heap and self._times.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        fired = []
+        while True:
+            when = self.peek()
+            if when is None or when > now:
+                return fired
+            when, task_id = heapq.heappop(self._heap)
+            del self._times[task_id]
+            fired.append((when, task_id))
+
+
+class TaskEngine:
+    """Task model, persistence and command handlers, with no UI attached.
+
+    The UI subclasses this and overrides the hooks (_log, _schedule_refresh,
+    _select_date, ...) to draw; left as they are, the engine runs headless.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tasks = TaskTable()
+        self.next_id = 1
+        self.store = None
+        self._pending_ops = []
+        # Ops queued since the last compaction; the store's own count lags behind the worker.
+        self._store_entries = 0
+        # Set while an import's chunks sit in an uncommitted store transaction.
+        self._open_transaction = False
+        self.index = TaskIndex()
+        self.search_index = SearchIndex()
+        self.counters = TaskCounters()
+        self.reminders = ReminderQueue()
+        self._reminder_at = None
+        self._streak_cache = None
+        self._search_cache = None
+        self._query_cache = {}
+        self._dirty_panels = set()
+        self.view_mode = "all"
+        self.view_value = None
+        self.visible_tasks = []
+        self._task_header = ""
+        self.text_filter = ""
+        self.sort_key = "due"
+        self.sort_reverse = False
+        self.hide_completed = False
+        self.undo_stack = deque(maxlen=UNDO_LIMIT)
+        self.redo_stack = deque(maxlen=UNDO_LIMIT)
+        self._undo_entry = None
+        self._batch = None
+        self._export_results = queue.Queue()
+        self._exports_running = 0
+        self.persist = PersistenceWorker()
+        self.stats = {"completed_dates": [], "daily_goal": 3}
+        self.error_count = 0
+
+    def _load_state(self):
+        self._load_stats()
+        self._set_undo_limit(self.stats.get("undo_limit", UNDO_LIMIT))
+        self._load_tasks()
+        # Row numbers resolve against visible_tasks, which is only built once "list" is stale.
+        self._dirty_panels.add("list")
+
+    def _log(self, message, tag="info"):
+        if self._batch is not None:
+            self._hold_message(message, tag)
+            return
+        if tag == "error":
+            self.error_count += 1
+            print(message, file=sys.stderr)
+        else:
+            print(message)
+
+    def _get_selected_date(self):
+        return None
+
+    def _select_date(self, day):
+        pass
+
+    def _set_filter_text(self, text):
+        self.text_filter = text
+
+    def _show_progress(self):
+        pass
+
+    def _arm_reminders(self):
+        pass
+
+    def _schedule_autosync(self):
+        pass
+
+    def _format_date(self, value):
+        if not value:
+            return "--.--"
+        return value.strftime("%d.%m.%Y")
+
+    def _format_time(self, value):
+        return value if value else "--:--"
+
+    def _parse_hhmm(self, raw):
+        if not raw:
+            return None
+        parts = raw.split(":")
+        if len(parts) != 2:
+            return None
+        try:
+            hour = int(parts[0])
+            minute = int(parts[1])
+        except ValueError:
+            return None
+        if hour < 0 or hour > 23 or minute < 0 or minute > 59:
+            return None
+        return f"{hour:02d}:{minute:02d}"
+
+    def _parse_date(self, raw, base_date=None):
+        if not raw:
+            return None
+        parts = raw.split(".")
+        if len(parts) not in (2, 3):
+            return None
+        try:
+            day = int(parts[0])
+            month = int(parts[1])
+            year = int(parts[2]) if len(parts) == 3 else None
+        except ValueError:
+            return None
+        if year is None:
+            if base_date is None:
+                base_date = self._get_selected_date() or date.today()
+            year = base_date.year
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    def _log_completion(self, completed_date):
+        try:
+            value = completed_date.isoformat()
+        except AttributeError:
+            value = str(completed_date)
+        dates = self.stats.get("completed_dates", [])
+        if dates and dates[-1] == value:
+            return
+        history = set(dates)
+        history.add(value)
+        self.stats["completed_dates"] = sorted(history)
+        self._streak_cache = None
+        self._save_stats()
+
+    def _compute_streak(self):
+        today = date.today()
+        if self._streak_cache and self._streak_cache[0] == today:
+            return self._streak_cache[1]
+        dates = set(self.stats.get("completed_dates", []))
+        streak = 0
+        cursor = today
+        while cursor.isoformat() in dates:
+            streak += 1
+            cursor -= timedelta(days=1)
+        self._streak_cache = (today, streak)
+        return streak
+
+    def _record(self, op, task):
+        # Every edit funnels through here, so the in-memory indexes follow the journal.
+        self._search_cache = None
+        if op == "remove":
+            self.index.discard(task["id"])
+            self.counters.discard(task["id"])
+            self.reminders.discard(task["id"])
+            self.search_index.discard(task["id"])
+        else:
+            self.index.update(task)
+            self.counters.update(task)
+            when = self._reminder_time(task)
+            if self.reminders.update(task["id"], when) and (
+                self._reminder_at is None or when < self._reminder_at
+            ):
+                self._arm_reminders()
+            self.search_index.update(task["id"], self._search_fields(task))
+        if op in ("add", "update"):
+            self._pending_ops.append({"op": op, "task": task.to_record()})
+        elif op == "complete":
+            self._pending_ops.append(
+                {"op": op, "id": task["id"], "completed_at": task.get("completed_at")}
+            )
+        else:
+            self._pending_ops.append({"op": op, "id": task["id"]})
+
+    def _save_tasks(self, commit=True):
+        if self._batch is not None:
+            return
+        ops, self._pending_ops = self._pending_ops, []
+        if ops or commit:
+            self._persist("append", self.store, ops, commit)
+            self._store_entries += len(ops)
+            self._open_transaction = not commit
+            if commit:
+                self._schedule_autosync()
+        if commit and self.store.needs_compaction(self._store_entries, len(self.tasks)):
+            self._compact_tasks()
+
+    def _compact_tasks(self):
+        self._pending_ops = []
+        self._store_entries = 0
+        self._persist("compact", self.store, [task.to_record() for task in self.tasks])
+
+    def _shutdown(self):
+        self._save_tasks()
+        # Throttled autosync copies can trail the last few saves; bring the mirror level before exit.
+        self._persist("mirror", self.store, True)
+        self.persist.flush(PERSIST_CLOSE_TIMEOUT)
+
+    def _persist(self, kind, *payload):
+        self.persist.submit(kind, *payload)
+
+    def _drain_persist_errors(self):
+        while True:
+            try:
+                message = self.persist.errors.get_nowait()
+            except queue.Empty:
+                break
+            self._log(message, "error")
+
+    def _open_store(self, mode):
+        if mode == "sqlite":
+            store = SqliteTaskStore(DB_FILE, mirror_dir=AUTOSYNC_DIR)
+            if store.is_new:
+                # One-shot migration of an existing tasks.json (+ journal) into the database.
+                legacy = TaskJournal(DATA_FILE, JOURNAL_FILE).load()
+                store.compact(
+                    [Task.from_record(item).to_record() for item in legacy]
+                )
+            return store
+        return TaskJournal(DATA_FILE, JOURNAL_FILE, mirror_dir=AUTOSYNC_DIR)
+
+    def _load_tasks(self):
+        self.store = self._open_store(self.stats.get("storage", "json"))
+        tasks = []
+        records = self.store.load()
+        # Only the journal has replayed entries; SQLite rows are written in place.
+        self._store_entries = getattr(self.store, "entries", 0)
+        for item in records:
+            task = Task.from_record(item)
+            if task["id"] > 0:
+                tasks.append(task)
+        self._replace_tasks(tasks)
+        self.next_id = max([t["id"] for t in tasks], default=0) + 1
+
+    def _replace_tasks(self, tasks):
+        self.tasks = TaskTable(tasks)
+        self.index.rebuild(tasks)
+        self.counters.rebuild(tasks)
+        self.reminders.rebuild((t["id"], self._reminder_time(t)) for t in tasks)
+        self.search_index.rebuild((t["id"], self._search_fields(t)) for t in tasks)
+        self._search_cache = None
+
+    def _search_fields(self, task):
+        return (
+            task["name"].lower(),
+            self._format_date(task["due"]) if task["due"] else "",
+            (task.get("priority") or "").lower(),
+            (task.get("time") or "").lower(),
+            (task.get("tag") or "").lower(),
+            (task.get("category") or "").lower(),
+        )
+
+    def _search_ids(self, query):
+        # A longer query that contains the previous one can only narrow its matches.
+        query = query.lower()
+        candidates = None
+        if self._search_cache and self._search_cache[0] in query:
+            candidates = self._search_cache[1]
+        ids = self.search_index.search(query, candidates)
+        self._search_cache = (query, ids)
+        return ids
+
+    def _insert_task(self, task):
+        if self._undo_entry is not None:
+            self._undo_entry["tasks"].setdefault(task["id"], None)
+        self.tasks.add(task)
+        self._record("add", task)
+
+    def _delete_task(self, task):
+        self._track_undo(task)
+        self.tasks.remove(task["id"])
+        self._record("remove", task)
+
+    def _tasks_from_ids(self, ids):
+        tasks = (self.tasks.get(i) for i in sorted(ids))
+        return [t for t in tasks if t is not None]
+
+    def _tasks_due_on(self, day):
+        return self._tasks_from_ids(self.index.ids("due", day))
+
+    def _load_stats(self):
+        if not STATS_FILE.exists():
+            return
+        try:
+            data = json.loads(STATS_FILE.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if isinstance(data, dict):
+            self.stats.update(data)
+
+    def _save_stats(self):
+        if self._batch is not None:
+            self._batch["stats"] = True
+            return
+        # Task files are mirrored by the stores themselves; stats.json is mirrored after each write.
+        self._persist("write", STATS_FILE, json.dumps(self.stats, indent=2), AUTOSYNC_DIR)
+
+    def _parse_ddmm(self, raw, base_date=None):
+        return self._parse_date(raw, base_date=base_date)
+
+    def _set_undo_limit(self, limit):
+        limit = max(1, int(limit))
+        self.undo_stack = deque(self.undo_stack, maxlen=limit)
+        self.redo_stack = deque(self.redo_stack, maxlen=limit)
+
+    def _push_undo(self):
+        # Opens an entry; _track_undo fills in the prior state of each task the command touches.
+        if self._batch is not None:
+            return
+        if self.undo_stack and not self.undo_stack[-1]["tasks"]:
+            self.undo_stack.pop()
+        self._undo_entry = {"tasks": {}, "next_id": self.next_id}
+        self.undo_stack.append(self._undo_entry)
+        self.redo_stack.clear()
+
+    def _track_undo(self, task):
+        if self._undo_entry is not None and task["id"] not in self._undo_entry["tasks"]:
+            self._undo_entry["tasks"][task["id"]] = task.to_record()
+
+    def _apply_delta(self, entry):
+        self._undo_entry = None
+        inverse = {"tasks": {}, "next_id": self.next_id}
+        for task_id, raw in entry["tasks"].items():
+            current = self.tasks.get(task_id)
+            inverse["tasks"][task_id] = current.to_record() if current else None
+            if raw is None:
+                if current:
+                    self._delete_task(current)
+            elif current:
+                current.assign(Task.from_record(raw))
+                self._record("update", current)
+            else:
+                self._insert_task(Task.from_record(raw))
+        self.next_id = entry["next_id"]
+        self._save_tasks()
+        self._refresh_all("State restored.", "success")
+        return inverse
+
+    def _refresh_all(self, message=None, tag="info"):
+        self._schedule_refresh(*REFRESH_PANELS)
+        if message:
+            self._log(message, tag)
+
+    def _schedule_refresh(self, *panels):
+        self._dirty_panels.update(panels)
+
+    def _flush_refresh(self):
+        dirty, self._dirty_panels = self._dirty_panels, set()
+        if "list" in dirty:
+            self._refresh_visible()
+
+    def _refresh_visible(self):
+        if self.text_filter:
+            try:
+                query = self._compile_query(self.text_filter)
+            except ValueError:
+                # Half-typed terms in the search box fall back to a plain substring match.
+                query = TaskQuery(self.text_filter)
+            tasks = self._run_query(query)
+            header = f"Filter: {self.text_filter}"
+        else:
+            tasks = self._view_candidates()
+            header = self._view_title()
+        self.visible_tasks = self._sort_tasks(tasks)
+        self._task_header = header
+
+    def _view_state(self):
+        return (
+            self.view_mode,
+            self.view_value,
+            self.text_filter,
+            self.sort_key,
+            self.sort_reverse,
+            self.hide_completed,
+        )
+
+    def _task_detail(self, task):
+        due_text = self._format_date(task["due"]) if task["due"] else "--.--"
+        time_text = self._format_time(task.get("time"))
+        repeat_text = f" | {task['recurrence']}" if task.get("recurrence") else ""
+        return f"{task['name']}  (due {due_text} {time_text}{repeat_text}) #{task['id']}"
+
+    def _print_view(self):
+        self._flush_refresh()
+        print(self._task_header)
+        if not self.visible_tasks:
+            print("No tasks found.")
+        for idx, task in enumerate(self.visible_tasks, start=1):
+            mark = "x" if task["status"] == "completed" else " "
+            print(f"[{mark}] {idx}. [{task.get('priority', 'med')}] {self._task_detail(task)}")
+
+    def _store_in_step(self):
+        # The database only sees edits once they are submitted, written and committed;
+        # until then the in-memory indexes are the ones to ask.
+        return (
+            self._batch is None
+            and not self._pending_ops
+            and not self._open_transaction
+            and not self.persist.pending
+        )
+
+    def _view_candidates(self):
+        ids = None
+        if self._store_in_step():
+            ids = self.store.query_ids(
+                self.view_mode, self.view_value, date.today(), self.hide_completed
+            )
+        if ids is None:
+            ids = self.index.view_ids(
+                self.view_mode, self.view_value, date.today(), self.hide_completed
+            )
+        if ids is None:
+            return [t for t in self.tasks if self._matches_view(t)]
+        return [t for t in self._tasks_from_ids(ids) if self._matches_view(t)]
+
+    def _compile_query(self, text):
+        key = (text, date.today())
+        query = self._query_cache.get(key)
+        if query is None:
+            query = self._parse_query(text)
+            if len(self._query_cache) >= QUERY_CACHE_SIZE:
+                self._query_cache.clear()
+            self._query_cache[key] = query
+        return query
+
+    def _parse_query(self, text):
+        try:
+            tokens = shlex.split(text)
+        except ValueError:
+            tokens = text.split()
+        query = TaskQuery()
+        words = []
+        for token in tokens:
+            match = QUERY_TERM.match(token)
+            if not match:
+                words.append(token)
+                continue
+            field, op, value = match.group(1).lower(), match.group(2), match.group(3).strip().lower()
+            field = {"cat": "category", "pri": "priority"}.get(field, field)
+            if field == "due":
+                self._add_due_term(query, op, value)
+                continue
+            if op not in (":", "="):
+                raise ValueError(f"'{field}' only supports ':'")
+            if field in ("tag", "category"):
+                if value in ("none", "-"):
+                    query.add(lambda t, f=field: not t.get(f))
+                else:
+                    query.add(
+                        lambda t, f=field, v=value: (t.get(f) or "").lower() == v,
+                        lambda index, f=field, v=value: index.ids_folded(f, v),
+                    )
+            elif field == "status":
+                value = {"done": "completed", "open": "pending"}.get(value, value)
+                if value not in ("pending", "completed"):
+                    raise ValueError("status must be pending or completed")
+                query.add(
+                    lambda t, v=value: t["status"] == v,
+                    lambda index, v=value: index.ids("status", v),
+                )
+            elif field == "priority":
+                if value not in ("low", "med", "high"):
+                    raise ValueError("priority must be low, med, or high")
+                query.add(lambda t, v=value: t.get("priority", "med") == v)
+            elif field == "repeat":
+                if value in ("none", "-"):
+                    query.add(lambda t: not t.get("recurrence"))
+                else:
+                    query.add(lambda t, v=value: t.get("recurrence") == v)
+        query.text = " ".join(words)
+        return query
+
+    def _add_due_term(self, query, op, value):
+        if value in ("none", "-"):
+            if op not in (":", "="):
+                raise ValueError("due:none cannot be compared")
+            query.add(lambda t: t["due"] is None)
+            return
+        today = date.today()
+        day = {
+            "today": today,
+            "tomorrow": today + timedelta(days=1),
+            "yesterday": today - timedelta(days=1),
+        }.get(value)
+        if day is None:
+            try:
+                day = date.fromisoformat(value)
+            except ValueError:
+                day = self._parse_date(value)
+        if day is None:
+            raise ValueError(f"invalid date '{value}'")
+        if (op == "<" and day == date.min) or (op == ">" and day == date.max):
+            raise ValueError(f"no date is {op} {value}")
+        if op in (":", "="):
+            start, end = day, day
+        elif op == "<":
+            start, end = date.min, day - timedelta(days=1)
+        elif op == "<=":
+            start, end = date.min, day
+        elif op == ">":
+            start, end = day + timedelta(days=1), date.max
+        else:
+            start, end = day, date.max
+        query.add(
+            lambda t: t["due"] is not None and start <= t["due"] <= end,
+            lambda index: index.due_between(start, end),
+        )
+
+    def _run_query(self, query):
+        # Index lookups narrow the candidates; only terms without one are checked per task.
+        archive = self.view_mode == "archive"
+        candidates = set(self.index.archived) if archive else None
+        residual = []
+        for lookup, check in query.terms:
+            if lookup is None or archive:
+                residual.append(check)
+                continue
+            ids = lookup(self.index)
+            candidates = set(ids) if candidates is None else candidates & ids
+        if query.text:
+            if candidates is None:
+                candidates = self._search_ids(query.text)
+            else:
+                candidates = self.search_index.search(query.text, candidates)
+        if candidates is None:
+            tasks = self._view_candidates()
+        else:
+            tasks = [t for t in self._tasks_from_ids(candidates) if self._matches_view(t)]
+        if residual:
+            tasks = [t for t in tasks if all(check(t) for check in residual)]
+        return tasks
+
+    def _matches_view(self, task):
+        if self.view_mode == "archive":
+            return task.archived
+        if task.archived:
+            return False
+        if self.hide_completed and task.status == "completed":
+            return False
+        due = task.due_ord
+        today = date.today().toordinal()
+        if self.view_mode == "due" and self.view_value:
+            return due == self.view_value.toordinal()
+        if self.view_mode == "today":
+            return due == today
+        if self.view_mode == "week":
+            return bool(due) and today <= due <= today + 6
+        if self.view_mode == "overdue":
+            return bool(due) and due < today and task.status != "completed"
+        return True
+
+    def _view_title(self):
+        if self.view_mode == "due" and self.view_value:
+            return f"Tasks due {self._format_date(self.view_value)}"
+        if self.view_mode == "today":
+            return "Tasks due today"
+        if self.view_mode == "week":
+            return "Tasks due this week"
+        if self.view_mode == "overdue":
+            return "Overdue tasks"
+        if self.view_mode == "archive":
+            return "Archived tasks"
+        return "All tasks"
+
+    def _sort_tasks(self, tasks):
+        if self.sort_key == "name":
+            key = lambda t: t["name"].lower()
+        elif self.sort_key == "status":
+            key = lambda t: 0 if t["status"] == "pending" else 1
+        elif self.sort_key == "priority":
+            key = lambda t: PRIORITY_ORDER.get(t.get("priority"), 3)
+        else:
+            key = lambda t: (not t.due_ord, t.due_ord, t.time or "99:99")
+        return sorted(tasks, key=key, reverse=self.sort_reverse)
+
+    def _execute_command(self, command_line):
+        try:
+            tokens = shlex.split(command_line)
+        except ValueError:
+            self._log("Invalid command format.", "error")
+            return
+        if not tokens:
+            return
+
+        cmd = tokens[0].lower()
+        args = tokens[1:]
+        cmd = COMMAND_ALIASES.get(cmd, cmd)
+        args = self._expand_short_flags(args)
+
+        handler = self._command_handlers().get(cmd)
+        if not handler:
+            self._log("Unknown command. Type 'help' for options.", "error")
+            return
+        handler(args)
+
+    def _command_handlers(self):
+        return {
+            "add": self._cmd_add,
+            "remove": self._cmd_remove,
+            "complete": self._cmd_complete,
+            "list": self._cmd_list,
+            "due": self._cmd_due,
+            "update": self._cmd_update,
+            "filter": self._cmd_filter,
+            "clear": self._cmd_clear,
+            "help": self._cmd_help,
+            "undo": self._cmd_undo,
+            "redo": self._cmd_redo,
+            "sort": self._cmd_sort,
+            "today": self._cmd_today,
+            "week": self._cmd_week,
+            "overdue": self._cmd_overdue,
+            "export": self._cmd_export,
+            "import": self._cmd_import,
+            "hide": self._toggle_hide_completed,
+            "archive": self._cmd_archive,
+            "capture": self._cmd_capture,
+            "goal": self._cmd_goal,
+            "reschedule": self._cmd_reschedule,
+            "exportics": self._cmd_exportics,
+            "short": self._cmd_short_help,
+            "storage": self._cmd_storage,
+            "source": self._cmd_source,
+        }
+
+    def _run_batch(self, lines, origin):
+        # One undo entry, one write and one refresh for the whole batch; messages are held back.
+        if self._batch is not None:
+            self._log("Batches cannot be nested.", "error")
+            return
+        # Rows are bound to the list as it stands now, so a pending view change lands first.
+        if "list" in self._dirty_panels:
+            self._flush_refresh()
+        self._push_undo()
+        self._batch = {"line": 0, "errors": [], "stats": False}
+        total = 0
+        try:
+            for number, line in enumerate(lines, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                total += 1
+                self._batch["line"] = number
+                name = line.split()[0].lower()
+                if COMMAND_ALIASES.get(name, name) in BATCH_EXCLUDED:
+                    self._hold_message(f"'{name}' cannot run inside a batch.", "error")
+                    continue
+                self._execute_command(line)
+        finally:
+            batch, self._batch = self._batch, None
+        self._save_tasks()
+        if batch["stats"]:
+            self._save_stats()
+        errors = batch["errors"]
+        for number, message in errors[:BATCH_ERROR_LOG]:
+            self._log(f"{origin} line {number}: {message}", "error")
+        if len(errors) > BATCH_ERROR_LOG:
+            self._log(f"... {len(errors) - BATCH_ERROR_LOG} more errors not shown.", "error")
+        failed = len({number for number, _ in errors})
+        self._refresh_all(
+            f"Ran {total - failed} of {total} commands from {origin}.",
+            "success" if not failed else "info",
+        )
+
+    def _hold_message(self, message, tag):
+        if tag == "error":
+            self._batch["errors"].append((self._batch["line"], message))
+
+    def _cmd_source(self, args):
+        if len(args) != 1:
+            self._log("Usage: source [filename]", "error")
+            return
+        path = Path(args[0])
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except (OSError, UnicodeDecodeError) as exc:
+            self._log(f"Could not read {path}: {exc}", "error")
+            return
+        self._run_batch(lines, path.name)
+
+    def _expand_short_flags(self, args):
+        if not args:
+            return args
+        mapping = {
+            "-d": "--time",
+            "-a": "--at",
+            "-g": "--tag",
+            "-p": "--priority",
+            "-r": "--repeat",
+            "-c": "--category",
+            "-m": "--remind",
+        }
+        expanded = []
+        for token in args:
+            expanded.append(mapping.get(token, token))
+        return expanded
+
+    def _parse_flags(self, tokens, multi_flags=None):
+        multi_flags = set(multi_flags or [])
+        args = []
+        flags = {}
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.startswith("--"):
+                flag = token
+                i += 1
+                if flag in multi_flags:
+                    value_parts = []
+                    while i < len(tokens) and not tokens[i].startswith("--"):
+                        value_parts.append(tokens[i])
+                        i += 1
+                    flags[flag] = " ".join(value_parts) if value_parts else None
+                else:
+                    value = None
+                    if i < len(tokens) and not tokens[i].startswith("--"):
+                        value = tokens[i]
+                        i += 1
+                    flags[flag] = value
+            else:
+                args.append(token)
+                i += 1
+        return args, flags
+
+    def _parse_remind(self, raw):
+        if raw is None or not str(raw).isdigit():
+            self._log("Reminder offset must be a number of minutes.", "error")
+            return False
+        return int(raw) or None
+
+    def _get_task_by_index(self, index):
+        # Inside a batch, row numbers keep pointing at the list as it was when the batch started.
+        if "list" in self._dirty_panels and self._batch is None:
+            self._flush_refresh()
+        if index < 1 or index > len(self.visible_tasks):
+            return None
+        task = self.visible_tasks[index - 1]
+        return task if task["id"] in self.tasks else None
+
+    @staticmethod
+    def _is_task_ref(token):
+        return token.isdigit() or (token[:1] == "#" and token[1:].isdigit())
+
+    def _resolve_task(self, token):
+        # "#12" addresses a task by id regardless of view; a bare number is its row in the list.
+        if token.startswith("#"):
+            task = self.tasks.get(int(token[1:]))
+            if not task:
+                self._log(f"No task with id {token}.", "error")
+            return task
+        task = self._get_task_by_index(int(token))
+        if not task:
+            self._log("Task number not found in current view.", "error")
+        return task
+
+    def _select_tasks(self, tokens):
+        # Rows and ranges are read off the current view; query terms (tag:work) search it like filter.
+        if any(QUERY_TERM.match(token) for token in tokens):
+            # A bare number here would become free text and match every date containing it.
+            for token in tokens:
+                if token.lower() == "all" or any(TASK_REF.match(part) for part in token.split(",")):
+                    self._log(
+                        f"Selector '{token}' cannot be combined with query terms; use one or the other.",
+                        "error",
+                    )
+                    return None
+            try:
+                query = self._compile_query(" ".join(tokens))
+            except ValueError as exc:
+                self._log(f"Invalid selector: {exc}.", "error")
+                return None
+            tasks = self._sort_tasks(self._run_query(query))
+        elif len(tokens) == 1 and tokens[0].lower() == "all":
+            if "list" in self._dirty_panels and self._batch is None:
+                self._flush_refresh()
+            tasks = [task for task in self.visible_tasks if task["id"] in self.tasks]
+        else:
+            tasks = []
+            for part in ",".join(tokens).split(","):
+                match = TASK_REF.match(part)
+                if not match:
+                    self._log(f"Invalid selector '{part}'. Use 3, 3-40, 1,4,9, #12, all or tag:x.", "error")
+                    return None
+                task_id, first, last = match.groups()
+                if task_id:
+                    task = self._resolve_task(part)
+                    if not task:
+                        return None
+                    tasks.append(task)
+                    continue
+                first = int(first)
+                last = int(last) if last else first
+                if last < first:
+                    self._log(f"Invalid range '{part}'.", "error")
+                    return None
+                for index in range(first, last + 1):
+                    task = self._get_task_by_index(index)
+                    if not task:
+                        self._log(f"Task number {index} not found in current view.", "error")
+                        return None
+                    tasks.append(task)
+        unique = {task["id"]: task for task in tasks}
+        if not unique:
+            self._log("No tasks match the selector.", "error")
+            return None
+        return list(unique.values())
+
+    def _cmd_add(self, args):
+        if not args:
+            self._log(
+                "Usage: add [task name] --time [dd.mm.yyyy] [hh:mm] --at [HH:MM] --tag [label] --category [label] --priority [low|med|high] --repeat [daily|weekly|monthly]",
+                "error",
+            )
+            return
+        name_parts, flags = self._parse_flags(args, multi_flags={"--time"})
+        name = " ".join(name_parts).strip()
+        if not name:
+            self._log("Task name is required.", "error")
+            return
+
+        due = None
+        clock = None
+        if "--time" in flags:
+            raw_time = flags.get("--time")
+            if raw_time is None:
+                self._log("Invalid date format. Use dd.mm.yyyy", "error")
+                return
+            if str(raw_time).lower() in ("none", "clear"):
+                due = None
+            else:
+                parts = str(raw_time).split()
+                due = self._parse_date(parts[0])
+                if due is None:
+                    self._log("Invalid date format. Use dd.mm.yyyy", "error")
+                    return
+                if len(parts) > 1:
+                    clock = self._parse_hhmm(parts[1])
+                    if clock is None:
+                        self._log("Invalid time format. Use HH:MM", "error")
+                        return
+        else:
+            due = self._get_selected_date()
+
+        if "--at" in flags:
+            clock = self._parse_hhmm(flags.get("--at"))
+            if clock is None:
+                self._log("Invalid time format. Use HH:MM", "error")
+                return
+
+        tag = None
+        if "--tag" in flags:
+            tag = flags.get("--tag")
+            if tag:
+                tag = str(tag).strip()
+        category = None
+        if "--category" in flags:
+            category = flags.get("--category")
+            if category:
+                category = str(category).strip()
+
+        priority = (flags.get("--priority") or "med").lower()
+        if priority not in ("low", "med", "high"):
+            self._log("Priority must be low, med, or high.", "error")
+            return
+        recurrence = flags.get("--repeat")
+        if recurrence:
+            recurrence = recurrence.lower()
+            if recurrence not in ("daily", "weekly", "monthly"):
+                self._log("Repeat must be daily, weekly, or monthly.", "error")
+                return
+            if due is None:
+                self._log("Repeat requires a due date. Use --time [dd.mm].", "error")
+                return
+        remind = None
+        if "--remind" in flags:
+            remind = self._parse_remind(flags.get("--remind"))
+            if remind is False:
+                return
+
+        self._push_undo()
+        task = Task(
+            id=self.next_id,
+            name=name,
+            due=due,
+            status="pending",
+            priority=priority,
+            recurrence=recurrence,
+            time=clock,
+            tag=tag,
+            category=category,
+            archived=False,
+            completed_at=None,
+            remind=remind,
+        )
+        self.next_id += 1
+        self._insert_task(task)
+        self._save_tasks()
+        self._refresh_all("Task added.", "success")
+
+    def _cmd_remove(self, args):
+        if not args:
+            self._log("Usage: remove [selector]", "error")
+            return
+        tasks = self._select_tasks(args)
+        if not tasks:
+            return
+        self._push_undo()
+        for task in tasks:
+            self._delete_task(task)
+        self._save_tasks()
+        self._refresh_all("Task removed." if len(tasks) == 1 else f"{len(tasks)} tasks removed.", "success")
+
+    def _cmd_complete(self, args):
+        if not args:
+            self._log("Usage: complete [selector]", "error")
+            return
+        tasks = self._select_tasks(args)
+        if not tasks:
+            return
+        tasks = [task for task in tasks if task["status"] != "completed"]
+        if not tasks:
+            self._log("Selected tasks are already completed.", "error")
+            return
+        self._push_undo()
+        today = date.today().isoformat()
+        spawned = []
+        for task in tasks:
+            self._track_undo(task)
+            task["status"] = "completed"
+            task["completed_at"] = today
+            self._record("complete", task)
+            if task.get("recurrence") and task.get("due"):
+                next_due = self._next_due(task["due"], task["recurrence"])
+                if next_due:
+                    spawned.append(
+                        Task(
+                            id=self.next_id + len(spawned),
+                            name=task["name"],
+                            due=next_due,
+                            status="pending",
+                            priority=task.get("priority", "med"),
+                            recurrence=task.get("recurrence"),
+                            time=task.get("time"),
+                            tag=task.get("tag"),
+                            archived=False,
+                            completed_at=None,
+                            remind=task.get("remind"),
+                        )
+                    )
+        # Next occurrences are added after the pass so a range never picks up a freshly spawned task.
+        for task in spawned:
+            self._insert_task(task)
+        self.next_id += len(spawned)
+        self._log_completion(date.today())
+        self._save_tasks()
+        if len(tasks) == 1:
+            self._refresh_all(f"Task completed: {tasks[0]['name']}.", "success")
+        else:
+            self._refresh_all(f"{len(tasks)} tasks completed.", "success")
+
+    def _cmd_list(self, _args=None):
+        self.view_mode = "all"
+        self.view_value = None
+        self._set_filter_text("")
+        self._schedule_refresh("list")
+        self._log("Listing all tasks.", "info")
+
+    def _cmd_due(self, args):
+        if len(args) != 1:
+            self._log("Usage: due [dd.mm]", "error")
+            return
+        due = self._parse_ddmm(args[0])
+        if due is None:
+            self._log("Invalid date format. Use dd.mm", "error")
+            return
+        self.view_mode = "due"
+        self.view_value = due
+        self._select_date(due)
+        self._schedule_refresh("list")
+        self._log(f"Showing tasks due {self._format_date(due)}.", "info")
+
+    def _cmd_update(self, args):
+        selector = []
+        while len(selector) < len(args) and not args[len(selector)].startswith("--"):
+            selector.append(args[len(selector)])
+        if not selector:
+            self._log(
+                "Usage: update [selector] --name [new name] --time [dd.mm.yyyy] [hh:mm] --at [HH:MM] --tag [label] --category [label] --priority [low|med|high] --repeat [daily|weekly|monthly]",
+                "error",
+            )
+            return
+        tasks = self._select_tasks(selector)
+        if not tasks:
+            return
+
+        name_parts, flags = self._parse_flags(args[len(selector):], multi_flags={"--name"})
+        if name_parts:
+            self._log("Use flags: --name and/or --time", "error")
+            return
+
+        new_name = flags.get("--name")
+        new_time = flags.get("--time")
+        new_clock = flags.get("--at")
+        new_priority = flags.get("--priority")
+        new_tag = flags.get("--tag")
+        new_category = flags.get("--category")
+        new_repeat = flags.get("--repeat")
+        new_remind = flags.get("--remind")
+
+        if (
+            new_name is None
+            and new_time is None
+            and new_clock is None
+            and new_priority is None
+            and new_tag is None
+            and new_category is None
+            and new_repeat is None
+            and new_remind is None
+        ):
+            self._log("Nothing to update. Provide --name, --time, --at, --tag, --category, --priority, --repeat, or --remind", "error")
+            return
+
+        # Only the fields named by a flag end up in changes; the rest keep each task's value.
+        changes = {}
+        if new_name is not None:
+            changes["name"] = new_name
+
+        if new_remind is not None:
+            if str(new_remind).lower() in ("none", "clear"):
+                changes["remind"] = None
+            else:
+                remind = self._parse_remind(new_remind)
+                if remind is False:
+                    return
+                changes["remind"] = remind
+
+        if new_time is not None:
+            if str(new_time).lower() in ("none", "clear"):
+                changes["due"] = None
+            else:
+                parts = str(new_time).split()
+                due = self._parse_date(parts[0])
+                if due is None:
+                    self._log("Invalid date format. Use dd.mm.yyyy", "error")
+                    return
+                changes["due"] = due
+                if len(parts) > 1:
+                    clock = self._parse_hhmm(parts[1])
+                    if clock is None:
+                        self._log("Invalid time format. Use HH:MM", "error")
+                        return
+                    changes["time"] = clock
+
+        if new_clock is not None:
+            if str(new_clock).lower() in ("none", "clear"):
+                changes["time"] = None
+            else:
+                clock = self._parse_hhmm(new_clock)
+                if clock is None:
+                    self._log("Invalid time format. Use HH:MM", "error")
+                    return
+                changes["time"] = clock
+
+        if new_repeat is not None:
+            if str(new_repeat).lower() in ("none", "clear"):
+                changes["recurrence"] = None
+            else:
+                repeat = new_repeat.lower()
+                if repeat not in ("daily", "weekly", "monthly"):
+                    self._log("Repeat must be daily, weekly, or monthly.", "error")
+                    return
+                changes["recurrence"] = repeat
+
+        for task in tasks:
+            if changes.get("recurrence", task["recurrence"]) and changes.get("due", task["due"]) is None:
+                if len(tasks) == 1:
+                    self._log("Repeat requires a due date.", "error")
+                else:
+                    self._log(f"Repeat requires a due date (task #{task['id']}).", "error")
+                return
+
+        if new_priority is not None:
+            priority = new_priority.lower()
+            if priority not in ("low", "med", "high"):
+                self._log("Priority must be low, med, or high.", "error")
+                return
+            changes["priority"] = priority
+        if new_tag is not None:
+            if str(new_tag).lower() in ("none", "clear"):
+                changes["tag"] = None
+            else:
+                changes["tag"] = str(new_tag).strip()
+        if new_category is not None:
+            if str(new_category).lower() in ("none", "clear"):
+                changes["category"] = None
+            else:
+                changes["category"] = str(new_category).strip()
+
+        self._push_undo()
+        completed = False
+        for task in tasks:
+            self._track_undo(task)
+            for field, value in changes.items():
+                task[field] = value
+            if task["status"] == "completed" and not task.get("completed_at"):
+                task["completed_at"] = date.today().isoformat()
+                completed = True
+            if task["status"] != "completed":
+                task["completed_at"] = None
+            self._record("update", task)
+        if completed:
+            self._log_completion(date.today())
+        self._save_tasks()
+        self._refresh_all("Task updated." if len(tasks) == 1 else f"{len(tasks)} tasks updated.", "success")
+
+    def _cmd_filter(self, args):
+        if not args:
+            self._log(
+                "Usage: filter [keyword] [tag:x] [category:x] [priority:x] [status:x] [repeat:x] [due<dd.mm]",
+                "error",
+            )
+            return
+        keyword = " ".join(shlex.quote(arg) if " " in arg else arg for arg in args).strip()
+        if not keyword:
+            self._log("Keyword required.", "error")
+            return
+        try:
+            self._compile_query(keyword)
+        except ValueError as exc:
+            self._log(f"Invalid filter: {exc}.", "error")
+            return
+        self._set_filter_text(keyword)
+        self._schedule_refresh("list")
+        self._log(f"Filtering tasks by '{keyword}'.", "info")
+
+    def _cmd_clear(self, _args=None):
+        self._push_undo()
+        for task in self.tasks:
+            self._track_undo(task)
+        self._replace_tasks([])
+        self.visible_tasks = []
+        self.view_mode = "all"
+        self.view_value = None
+        self._set_filter_text("")
+        self._compact_tasks()
+        self._refresh_all("All tasks cleared.", "success")
+
+    def _cmd_help(self, _args=None):
+        self._print_help()
+        self._print_short_help()
+
+    def _print_help(self):
+        help_text = (
+            "Commands:\n"
+            "  add [task name] --time [dd.mm.yyyy] [hh:mm] --at [HH:MM] --tag [label] --category [label] --priority [low|med|high] --repeat [daily|weekly|monthly] --remind [minutes before]\n"
+            "  remove [selector]\n"
+            "  complete [selector]\n"
+            "  list\n"
+            "  due [dd.mm]\n"
+            "  update [selector] --name [new name] --time [dd.mm.yyyy] [hh:mm] --at [HH:MM] --tag [label] --category [label] --priority [low|med|high] --repeat [daily|weekly|monthly] --remind [minutes before]\n"
+            "  filter [keyword] [tag:x] [category:x] [priority:x] [status:x] [repeat:x] [due<dd.mm]\n"
+            "  clear\n"
+            "  today | week | overdue\n"
+            "  hide  (toggle hide completed)\n"
+            "  refresh [stats]\n"
+            "  theme [cyber|toxic|ember]\n"
+            "  archive [view|restore]\n"
+            "  focus\n"
+            "  capture [task name]\n"
+            "  goal [number]\n"
+            "  reschedule overdue\n"
+            "  exportics [filename.ics]\n"
+            "  pomodoro start [task number|#id] [minutes]\n"
+            "  pomodoro stop | status\n"
+            "  sort [name|due|priority|status] [asc|desc]\n"
+            "  sort --priority | --due-date | --completed\n"
+            "  undo | redo\n"
+            "  undo limit [number]\n"
+            "  export [filename.csv|.ics|.jsonl[.gz]] [--format csv|ics|jsonl] [--gzip]\n"
+            "  import [filename.csv]\n"
+            "  source [filename]  (run one command per line as a single batch)\n"
+            "  storage [json|sqlite]\n"
+            "  effects [off|low|full]\n"
+            "Selectors: 3 | 3-40 | 1,4,9 | #12 (task id) | all | tag:work status:pending\n"
+        )
+        self._log(help_text, "info")
+
+    def _print_short_help(self):
+        short_text = (
+            "Short commands:\n"
+            "  a add | rm remove | c complete | ls list | u update | du due | fl filter | cl clear\n"
+            "  ref refresh | th theme | ar archive | fo focus | cap capture | rs reschedule | ics exportics | pomo pomodoro\n"
+            "Short flags:\n"
+            "  -d date | -a time | -g tag | -c category | -p priority | -r repeat | -m remind\n"
+        )
+        self._log(short_text, "info")
+
+    def _cmd_short_help(self, _args=None):
+        self._print_short_help()
+
+    def _next_due(self, due, recurrence):
+        if recurrence == "daily":
+            return due + timedelta(days=1)
+        if recurrence == "weekly":
+            return due + timedelta(days=7)
+        if recurrence == "monthly":
+            month = due.month + 1
+            year = due.year + (month - 1) // 12
+            month = (month - 1) % 12 + 1
+            day = min(due.day, 28)
+            return date(year, month, day)
+        return None
+
+    def _cmd_today(self, _args=None):
+        self.view_mode = "today"
+        self.view_value = None
+        self._schedule_refresh("list")
+        self._log("Showing tasks due today.", "info")
+
+    def _cmd_week(self, _args=None):
+        self.view_mode = "week"
+        self.view_value = None
+        self._schedule_refresh("list")
+        self._log("Showing tasks due this week.", "info")
+
+    def _cmd_overdue(self, _args=None):
+        self.view_mode = "overdue"
+        self.view_value = None
+        self._schedule_refresh("list")
+        self._log("Showing overdue tasks.", "info")
+
+    def _cmd_capture(self, args):
+        if not args:
+            self._log("Usage: capture [task name]", "error")
+            return
+        name = " ".join(args).strip()
+        if not name:
+            self._log("Task name required.", "error")
+            return
+        self._push_undo()
+        task = Task(
+            id=self.next_id,
+            name=name,
+            due=date.today(),
+            status="pending",
+            priority="med",
+            recurrence=None,
+            time=None,
+            tag="inbox",
+            archived=False,
+            completed_at=None,
+        )
+        self.next_id += 1
+        self._insert_task(task)
+        self._save_tasks()
+        self._refresh_all("Captured to inbox (today).", "success")
+
+    def _cmd_goal(self, args):
+        if not args or not args[0].isdigit():
+            self._log("Usage: goal [number]", "error")
+            return
+        self.stats["daily_goal"] = int(args[0])
+        self._save_stats()
+        self._schedule_refresh("stats")
+        self._log("Daily goal updated.", "success")
+
+    def _cmd_reschedule(self, args):
+        if not args or args[0].lower() != "overdue":
+            self._log("Usage: reschedule overdue", "error")
+            return
+        today = date.today()
+        moved = 0
+        self._push_undo()
+        for task in self.tasks:
+            if task.get("archived"):
+                continue
+            if task["due"] and task["due"] < today and task["status"] != "completed":
+                self._track_undo(task)
+                task["due"] = today
+                self._record("update", task)
+                moved += 1
+        if moved == 0:
+            self._log("No overdue tasks to reschedule.", "error")
+            return
+        self._save_tasks()
+        self._refresh_all(f"Rescheduled {moved} overdue tasks to today.", "success")
+
+    def _cmd_exportics(self, args):
+        self._cmd_export(args or ["tasks.ics"], fmt="ics")
+
+    def _cmd_archive(self, args):
+        if args and args[0].lower() == "view":
+            self.view_mode = "archive"
+            self._schedule_refresh("list")
+            self._log("Showing archived tasks.", "info")
+            return
+        if args and args[0].lower() == "restore":
+            archived = [t for t in self.tasks if t.get("archived")]
+            if not archived:
+                self._log("No archived tasks to restore.", "error")
+                return
+            self._push_undo()
+            for task in archived:
+                self._track_undo(task)
+                task["archived"] = False
+                self._record("update", task)
+            self._save_tasks()
+            self._refresh_all("Archived tasks restored.", "success")
+            return
+
+        completed = [t for t in self.tasks if t["status"] == "completed" and not t.get("archived")]
+        if not completed:
+            self._log("No completed tasks to archive.", "error")
+            return
+        self._push_undo()
+        for task in completed:
+            self._track_undo(task)
+            task["archived"] = True
+            self._record("update", task)
+        self._save_tasks()
+        self._refresh_all("Completed tasks archived.", "success")
+
+    def _toggle_hide_completed(self, _args=None):
+        self.hide_completed = not self.hide_completed
+        self._schedule_refresh("list")
+        state = "ON" if self.hide_completed else "OFF"
+        self._log(f"Hide completed: {state}", "info")
+
+    def _cmd_sort(self, args):
+        if not args:
+            self._log("Usage: sort [name|due|priority|status] [asc|desc]", "error")
+            return
+        key = args[0].lower()
+        if key in ("--priority",):
+            key = "priority"
+        elif key in ("--due-date", "--duedate"):
+            key = "due"
+        elif key in ("--completed", "--status"):
+            key = "status"
+        if key not in ("name", "due", "priority", "status"):
+            self._log("Sort key must be name, due, priority, or status.", "error")
+            return
+        order = args[1].lower() if len(args) > 1 else "asc"
+        if order not in ("asc", "desc"):
+            self._log("Sort order must be asc or desc.", "error")
+            return
+        self.sort_key = key
+        self.sort_reverse = order == "desc"
+        self._schedule_refresh("list")
+        self._log(f"Sorting by {key} ({order}).", "info")
+
+    def _cmd_undo(self, args=None):
+        if args and args[0].lower() == "limit":
+            if len(args) < 2 or not args[1].isdigit() or int(args[1]) < 1:
+                self._log(f"Undo limit: {self.undo_stack.maxlen}. Usage: undo limit [number]", "info")
+                return
+            self.stats["undo_limit"] = int(args[1])
+            self._set_undo_limit(self.stats["undo_limit"])
+            self._save_stats()
+            self._log(f"Undo limit set to {self.undo_stack.maxlen}.", "success")
+            return
+        while self.undo_stack and not self.undo_stack[-1]["tasks"]:
+            self.undo_stack.pop()
+        if not self.undo_stack:
+            self._log("Nothing to undo.", "error")
+            return
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(self._apply_delta(entry))
+
+    def _cmd_redo(self, _args=None):
+        if not self.redo_stack:
+            self._log("Nothing to redo.", "error")
+            return
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(self._apply_delta(entry))
+
+    def _cmd_storage(self, args):
+        current = self.stats.get("storage", "json")
+        if not args:
+            self._log(f"Storage: {current}", "info")
+            return
+        mode = args[0].lower()
+        if mode not in ("json", "sqlite"):
+            self._log("Usage: storage [json|sqlite]", "error")
+            return
+        if mode == current:
+            self._log(f"Storage already {mode}.", "info")
+            return
+        self._save_tasks()
+        self.persist.flush()
+        self.store = self._open_store(mode)
+        self._compact_tasks()
+        self.stats["storage"] = mode
+        self._save_stats()
+        self._refresh_all(f"Storage switched to {mode}.", "success")
+
+    def _cmd_export(self, args, fmt=None):
+        args = list(args or [])
+        compress = "--gzip" in args
+        args = [arg for arg in args if arg != "--gzip"]
+        if "--format" in args:
+            pos = args.index("--format")
+            fmt = args[pos + 1].lower() if pos + 1 < len(args) else ""
+            del args[pos : pos + 2]
+            if fmt not in TaskExporter.FORMATS:
+                self._log("Usage: export [filename] [--format csv|ics|jsonl] [--gzip]", "error")
+                return
+        if args:
+            target = Path(args[0])
+            detected, gz = TaskExporter.detect(target)
+            fmt = fmt or detected or "csv"
+            compress = compress or gz
+        else:
+            fmt = fmt or "csv"
+            target = CSV_DEFAULT.with_suffix(TaskExporter.FORMATS[fmt])
+            if compress:
+                target = target.with_name(target.name + ".gz")
+        # Records are copied here so the worker never reads a task while a command edits it.
+        snapshot = [task.copy() for task in self.tasks]
+        self._exports_running += 1
+        self._log(f"Exporting {len(snapshot)} tasks to {target} ({fmt})...", "info")
+        self._start_export(TaskExporter(fmt), target, snapshot, compress)
+
+    def _start_export(self, exporter, target, snapshot, compress):
+        self._run_export(exporter, target, snapshot, compress)
+        self._drain_exports()
+
+    def _run_export(self, exporter, target, snapshot, compress):
+        try:
+            count = exporter.write(target, (t.to_record() for t in snapshot), compress)
+        except OSError as exc:
+            self._export_results.put((target, exporter.fmt, None, exc))
+        else:
+            self._export_results.put((target, exporter.fmt, count, None))
+
+    def _drain_exports(self):
+        while True:
+            try:
+                target, fmt, count, error = self._export_results.get_nowait()
+            except queue.Empty:
+                break
+            self._exports_running -= 1
+            if error is not None:
+                self._log(f"Export to {target} failed: {error}", "error")
+            else:
+                self._log(f"Exported {count} tasks to {target} ({fmt}).", "success")
+
+    def _cmd_import(self, args):
+        target = CSV_DEFAULT if not args else Path(args[0])
+        if not target.exists():
+            self._log("CSV file not found.", "error")
+            return
+        first_id = self.next_id
+        base_date = self._get_selected_date() or date.today()
+        seen = {(t["name"].lower(), t["due"]) for t in self.tasks}
+        parsed = {}
+        rows = added = duplicates = failed = 0
+        reader = None
+        self._push_undo()
+        try:
+            with target.open("r", newline="", encoding="utf-8") as handle:
+                reader = csv.DictReader(handle)
+                for chunk in self._read_import_chunks(reader):
+                    rows += len(chunk)
+                    for line, task, error in self._validate_import_chunk(chunk, parsed, base_date):
+                        if error:
+                            failed += 1
+                            if failed <= IMPORT_ERROR_LOG:
+                                self._log(f"Line {line}: {error}", "error")
+                            continue
+                        key = (task["name"].lower(), task["due"])
+                        if key in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(key)
+                        task["id"] = self.next_id
+                        self.next_id += 1
+                        self._insert_task(task)
+                        added += 1
+                    self._save_tasks(commit=False)
+                    self._log(f"Importing... {rows} rows read, {added} added.", "info")
+                    self._show_progress()
+        except (OSError, csv.Error, UnicodeDecodeError) as exc:
+            self._rollback_import(first_id)
+            line = reader.line_num if reader is not None else 0
+            self._log(f"Import failed near line {line}: {exc}. Nothing was imported.", "error")
+            return
+        if not rows:
+            self._rollback_import(first_id)
+            self._log("CSV file is empty.", "error")
+            return
+        # Chunks are written on the worker, so a failed one only shows up once the queue drains.
+        self.persist.flush()
+        if self.store in self.persist.failed:
+            self._rollback_import(first_id)
+            self._drain_persist_errors()
+            self._log("Import failed while saving. Nothing was imported.", "error")
+            return
+        self._save_tasks()
+        if failed > IMPORT_ERROR_LOG:
+            self._log(f"... +{failed - IMPORT_ERROR_LOG} more rows with errors", "error")
+        self._refresh_all(
+            f"Imported {added} tasks ({duplicates} duplicates skipped, {failed} rows rejected).",
+            "success" if added else "info",
+        )
+
+    def _read_import_chunks(self, reader):
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= IMPORT_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _parse_import_date(self, raw, base_date):
+        try:
+            return date.fromisoformat(raw)
+        except ValueError:
+            return self._parse_ddmm(raw, base_date=base_date)
+
+    def _validate_import_chunk(self, chunk, parsed, base_date):
+        # Date and time strings repeat heavily in exports, so each distinct one is parsed once.
+        if len(parsed) > IMPORT_PARSE_CACHE:
+            parsed.clear()
+        results = []
+        today = date.today().isoformat()
+        for line, row in chunk:
+            name = (row.get("name") or "").strip()
+            raw_due = (row.get("due") or "").strip()
+            raw_time = (row.get("time") or "").strip()
+            status = (row.get("status") or "pending").strip().lower()
+            priority = (row.get("priority") or "med").strip().lower()
+            recurrence = (row.get("recurrence") or "").strip().lower() or None
+            raw_remind = (row.get("remind") or "").strip()
+            due = time_val = None
+            if raw_due:
+                if ("due", raw_due) not in parsed:
+                    parsed[("due", raw_due)] = self._parse_import_date(raw_due, base_date)
+                due = parsed[("due", raw_due)]
+            if raw_time:
+                if ("time", raw_time) not in parsed:
+                    parsed[("time", raw_time)] = self._parse_hhmm(raw_time)
+                time_val = parsed[("time", raw_time)]
+            if not name:
+                error = "missing task name"
+            elif raw_due and due is None:
+                error = f"invalid due date '{raw_due}'"
+            elif raw_time and time_val is None:
+                error = f"invalid time '{raw_time}'"
+            elif status not in ("pending", "completed"):
+                error = f"unknown status '{status}'"
+            elif priority not in ("low", "med", "high"):
+                error = f"unknown priority '{priority}'"
+            elif recurrence and recurrence not in ("daily", "weekly", "monthly"):
+                error = f"unknown repeat '{recurrence}'"
+            elif raw_remind and not raw_remind.isdigit():
+                error = f"invalid remind minutes '{raw_remind}'"
+            else:
+                error = None
+            if error:
+                results.append((line, None, error))
+                continue
+            completed_at = None
+            if status == "completed":
+                # Exports without a completed_at column count as done today, like `update --status`.
+                raw_done = (row.get("completed_at") or "").strip()
+                try:
+                    completed_at = date.fromisoformat(raw_done).isoformat() if raw_done else today
+                except ValueError:
+                    completed_at = today
+            task = Task(
+                id=None,
+                name=name,
+                due=due,
+                time=time_val,
+                status=status,
+                priority=priority,
+                recurrence=recurrence,
+                tag=(row.get("tag") or "").strip() or None,
+                category=(row.get("category") or "").strip() or None,
+                archived=(row.get("archived") or "").strip().lower() in ("1", "true", "yes"),
+                completed_at=completed_at,
+                remind=(int(raw_remind) or None) if raw_remind else None,
+            )
+            results.append((line, task, None))
+        return results
+
+    def _rollback_import(self, first_id):
+        self._persist("rollback", self.store)
+        self._pending_ops = []
+        self._open_transaction = False
+        if self.undo_stack and self.undo_stack[-1] is self._undo_entry:
+            self.undo_stack.pop()
+        self._undo_entry = None
+        if self.next_id != first_id:
+            self._replace_tasks([t for t in self.tasks if t["id"] < first_id])
+            self.next_id = first_id
+            self._refresh_all()
+
+    def _reminder_time(self, task):
+        if task["status"] == "completed" or task.get("archived") or not task["due"]:
+            return None
+        due = task["due"]
+        clock = self._parse_hhmm(task.get("time"))
+        hour, minute = (int(part) for part in clock.split(":")) if clock else (0, 0)
+        moment = datetime(due.year, due.month, due.day, hour, minute)
+        return moment - timedelta(minutes=task.get("remind") or 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run to-do commands against the task files without starting the UI."
+    )
+    parser.add_argument(
+        "-e", "--exec", dest="commands", action="append", default=[], metavar="COMMAND",
+        help='command to run, e.g. "add milk --tag home"; may be repeated',
+    )
+    parser.add_argument(
+        "-s", "--script", metavar="FILE", help="file with one command per line ('-' reads stdin)"
+    )
+    options = parser.parse_args(argv)
+    lines = list(options.commands)
+    if options.script:
+        try:
+            text = sys.stdin.read() if options.script == "-" else Path(options.script).read_text(encoding="utf-8")
+        except OSError as exc:
+            parser.error(f"cannot read {options.script}: {exc}")
+        lines.extend(text.splitlines())
+    if not lines:
+        parser.error("nothing to run; pass --exec or --script")
+
+    engine = TaskEngine()
+    engine._load_state()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        # View commands have nothing to draw on, so whatever they select is printed instead.
+        view = engine._view_state()
+        engine._execute_command(line)
+        name = line.split()[0].lower()
+        if engine._view_state() != view or COMMAND_ALIASES.get(name, name) == "list":
+            engine._print_view()
+    engine._shutdown()
+    engine._drain_persist_errors()
+    return 1 if engine.error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())